@@ -1 +1,2 @@
+from . import dashboard_replica
 from . import dashboard_report
@@ -0,0 +1,189 @@
+import logging
+import time
+from contextlib import contextmanager
+
+import psycopg2
+
+from odoo import models, api, sql_db
+from odoo.api import Transaction
+
+_logger = logging.getLogger(__name__)
+
+# System parameters:
+#   custom_report_dashboard.replica_uri      postgresql:// URI, or a database name on the same server
+#                                            (e.g. a local copy used as stand-in replica). Empty disables routing.
+#   custom_report_dashboard.replica_max_lag  seconds of replay lag tolerated before falling back (default 30)
+# The lag probe only needs pg_stat_wal_receiver.pid, which is visible to any role,
+# so the Odoo database role needs no pg_read_all_stats grant on the replica.
+REPLICA_URI_PARAM = 'custom_report_dashboard.replica_uri'
+REPLICA_MAX_LAG_PARAM = 'custom_report_dashboard.replica_max_lag'
+
+# Context key set by the dashboard actions; only calls carrying it are routed
+REPLICA_CONTEXT_KEY = 'dashboard_use_replica'
+
+# After a failure the replica is skipped for this many seconds
+REPLICA_RETRY_DELAY = 60
+_replica_down_until = {}
+
+# Errors on the replica that mean "use the primary instead": lost connection, recovery
+# conflicts on a hot standby, or a stand-in whose schema is behind the primary
+REPLICA_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError, psycopg2.ProgrammingError)
+
+
+def _mark_replica_down(uri):
+    _replica_down_until[uri] = time.time() + REPLICA_RETRY_DELAY
+
+
+class DashboardReplicaMixin(models.AbstractModel):
+    _name = 'dashboard.replica.mixin'
+    _description = 'Dashboard Read-only Replica Routing'
+
+    def _replica_lag(self, cr):
+        """Return the replay lag of the database behind `cr` in seconds.
+
+        A plain database (not in recovery) has no lag. A standby without a
+        running WAL receiver, or that never replayed a transaction, counts
+        as infinitely behind.
+        """
+        # Only pid is readable without pg_read_all_stats; status would read as NULL
+        cr.execute("""
+            SELECT pg_is_in_recovery(),
+                   EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE pid IS NOT NULL),
+                   pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn(),
+                   EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+        """)
+        in_recovery, receiving, caught_up, replay_age = cr.fetchone()
+        if not in_recovery:
+            return 0.0
+        if not receiving or replay_age is None:
+            return float('inf')
+        if caught_up:
+            return 0.0
+        return float(replay_age)
+
+    @contextmanager
+    def _replica_env(self):
+        """Yield an environment bound to a read-only cursor on the reporting replica.
+
+        Yields None unless the caller opted in through the context, or when no
+        replica is configured, it cannot be reached or it lags too far behind;
+        callers then stay on the primary database. Connections come from
+        Odoo's shared connection pool.
+        """
+        if not self.env.context.get(REPLICA_CONTEXT_KEY) or self.env.context.get('dashboard_on_replica'):
+            yield None
+            return
+        params = self.env['ir.config_parameter'].sudo()
+        uri = params.get_param(REPLICA_URI_PARAM)
+        if not uri or _replica_down_until.get(uri, 0) > time.time():
+            yield None
+            return
+        try:
+            max_lag = float(params.get_param(REPLICA_MAX_LAG_PARAM, 30))
+        except ValueError:
+            max_lag = 30.0
+
+        try:
+            cr = sql_db.db_connect(uri, allow_uri=True).cursor()
+        except Exception:
+            _logger.warning("Dashboard replica %s unavailable, using primary database", uri, exc_info=True)
+            _mark_replica_down(uri)
+            yield None
+            return
+
+        try:
+            cr.execute("SET TRANSACTION READ ONLY")
+            lag = self._replica_lag(cr)
+        except Exception:
+            _logger.warning("Dashboard replica %s check failed, using primary database", uri, exc_info=True)
+            _mark_replica_down(uri)
+            self._close_replica_cursor(cr)
+            yield None
+            return
+
+        if lag > max_lag:
+            _logger.info("Dashboard replica %s lags %.1fs (max %.1fs), using primary database", uri, lag, max_lag)
+            self._close_replica_cursor(cr)
+            yield None
+            return
+
+        # Share the primary registry so a stand-in database with another name does not load its own
+        cr.transaction = Transaction(self.env.registry)
+        try:
+            yield self.env(cr=cr, context=dict(self.env.context, dashboard_on_replica=True))
+        except REPLICA_ERRORS:
+            _mark_replica_down(uri)
+            raise
+        finally:
+            self._close_replica_cursor(cr)
+
+    def _close_replica_cursor(self, cr):
+        try:
+            cr.rollback()
+        except Exception:
+            pass
+        cr.close()
+
+    def _call_on_replica(self, method_name, *args, **kwargs):
+        """Run `method_name` on the replica; return (True, result), or (False, None) to use the primary."""
+        try:
+            with self._replica_env() as replica_env:
+                if replica_env is None:
+                    return False, None
+                return True, getattr(self.with_env(replica_env), method_name)(*args, **kwargs)
+        except REPLICA_ERRORS:
+            # _replica_env already marked the replica down
+            _logger.warning("Dashboard replica query %s.%s failed, retrying on primary database",
+                            self._name, method_name, exc_info=True)
+            return False, None
+
+    # Read-heavy entry points used by the dashboard views. They only return plain
+    # data, never records bound to the replica cursor. The web_* methods are routed
+    # whole so rows and counts of one list or grouped view come from the same
+    # cursor. export_data stays on the primary: its ids come from the primary and
+    # may not exist on the replica yet.
+
+    @api.model
+    def web_search_read(self, domain=None, fields=None, offset=0, limit=None, order=None, count_limit=None):
+        routed, result = self._call_on_replica(
+            'web_search_read', domain=domain, fields=fields, offset=offset, limit=limit, order=order,
+            count_limit=count_limit)
+        if routed:
+            return result
+        return super().web_search_read(domain=domain, fields=fields, offset=offset, limit=limit, order=order,
+                                       count_limit=count_limit)
+
+    @api.model
+    def web_read_group(self, domain, fields, groupby, limit=None, offset=0, orderby=False,
+                       lazy=True, expand=False, expand_limit=None, expand_orderby=False):
+        routed, result = self._call_on_replica(
+            'web_read_group', domain, fields, groupby, limit=limit, offset=offset, orderby=orderby,
+            lazy=lazy, expand=expand, expand_limit=expand_limit, expand_orderby=expand_orderby)
+        if routed:
+            return result
+        return super().web_read_group(domain, fields, groupby, limit=limit, offset=offset, orderby=orderby,
+                                      lazy=lazy, expand=expand, expand_limit=expand_limit,
+                                      expand_orderby=expand_orderby)
+
+    @api.model
+    def search_count(self, domain, limit=None):
+        routed, result = self._call_on_replica('search_count', domain, limit=limit)
+        if routed:
+            return result
+        return super().search_count(domain, limit=limit)
+
+    @api.model
+    def read_group(self, domain, fields, groupby, offset=0, limit=None, orderby=False, lazy=True):
+        routed, result = self._call_on_replica(
+            'read_group', domain, fields, groupby, offset=offset, limit=limit, orderby=orderby, lazy=lazy)
+        if routed:
+            return result
+        return super().read_group(domain, fields, groupby, offset=offset, limit=limit, orderby=orderby, lazy=lazy)
+
+    @api.model
+    def search_read(self, domain=None, fields=None, offset=0, limit=None, order=None, **read_kwargs):
+        routed, result = self._call_on_replica(
+            'search_read', domain=domain, fields=fields, offset=offset, limit=limit, order=order, **read_kwargs)
+        if routed:
+            return result
+        return super().search_read(domain=domain, fields=fields, offset=offset, limit=limit, order=order, **read_kwargs)
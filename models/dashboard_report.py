@@ -1,10 +1,12 @@
 from odoo import models, fields, api
+from odoo.exceptions import UserError
 from datetime import datetime, timedelta, date
 
 
 
 class DashboardReport(models.Model):
     _name = 'dashboard.report'
+    _inherit = ['dashboard.replica.mixin']
     _description = 'Dashboard Report'
 
     name = fields.Char('Report Name')
@@ -286,6 +288,154 @@ class DashboardReport(models.Model):
 
         return {'removed': removed, 'created': created}
 
+    def _employee_hours_subquery(self, domain):
+        """Return (sql, params) summing working_hours per employee for records matching `domain`.
+
+        The domain goes through the ORM query builder so search view filters
+        (current month, tag, department, ...) and record rules still apply.
+        """
+        self.check_access_rights('read')
+        # Raw SQL below: push pending ORM writes first, as search() does
+        self._flush_search(domain or [], fields=['employee_id', 'working_hours'])
+        query = self._where_calc(domain or [])
+        self._apply_ir_rules(query, 'read')
+        from_clause, where_clause, params = query.get_sql()
+        sql = f"""
+            SELECT "dashboard_report"."employee_id" AS employee_id,
+                   SUM(COALESCE("dashboard_report"."working_hours", 0)) AS hours,
+                   COUNT(*) AS record_count
+              FROM {from_clause}
+             WHERE {where_clause or 'TRUE'}
+               AND "dashboard_report"."employee_id" IS NOT NULL
+          GROUP BY "dashboard_report"."employee_id"
+        """
+        return sql, params
+
+    @api.model
+    def get_employee_hours_graph_data(self, domain=None, top_n=20, bucket_size=None, max_buckets=20):
+        """Working hours per employee reduced to a bounded payload.
+
+        Returns the `top_n` employees by hours plus an "others" bucket holding
+        the rest. With `bucket_size`, also returns a histogram of employees per
+        hours range, the last bucket being open-ended after `max_buckets`.
+        """
+        routed, result = self._call_on_replica(
+            'get_employee_hours_graph_data', domain, top_n=top_n, bucket_size=bucket_size, max_buckets=max_buckets)
+        if routed:
+            return result
+
+        top_n = max(int(top_n or 0), 0)
+        if bucket_size is not None and bucket_size is not False and float(bucket_size) <= 0:
+            raise UserError("Hours bucket size must be greater than zero.")
+        per_employee_sql, params = self._employee_hours_subquery(domain)
+
+        self.env.cr.execute(f"""
+            WITH per_employee AS ({per_employee_sql}),
+                 ranked AS (
+                     SELECT CASE WHEN ROW_NUMBER() OVER (ORDER BY hours DESC, employee_id) <= %s
+                                 THEN employee_id END AS employee_id,
+                            hours, record_count
+                       FROM per_employee
+                 )
+            SELECT employee_id,
+                   SUM(hours) AS hours,
+                   SUM(record_count) AS record_count,
+                   COUNT(*) AS employee_count
+              FROM ranked
+          GROUP BY employee_id
+          ORDER BY employee_id IS NULL, hours DESC
+        """, params + [top_n])
+        rows = self.env.cr.dictfetchall()
+
+        employees = self.env['hr.employee'].browse([r['employee_id'] for r in rows if r['employee_id']])
+        names = {emp.id: emp.display_name for emp in employees}
+        top = []
+        others = {'hours': 0.0, 'record_count': 0, 'employee_count': 0, 'employee_ids_excluded': []}
+        for r in rows:
+            if r['employee_id']:
+                top.append({
+                    'employee_id': r['employee_id'],
+                    'name': names.get(r['employee_id'], ''),
+                    'hours': round(r['hours'] or 0.0, 2),
+                    'record_count': r['record_count'],
+                })
+            else:
+                others.update({
+                    'hours': round(r['hours'] or 0.0, 2),
+                    'record_count': r['record_count'],
+                    'employee_count': r['employee_count'],
+                })
+        others['employee_ids_excluded'] = [t['employee_id'] for t in top]
+
+        result = {'top': top, 'others': others}
+        if bucket_size:
+            bucket_size = float(bucket_size)
+            max_buckets = max(int(max_buckets or 1), 1)
+            self.env.cr.execute(f"""
+                WITH per_employee AS ({per_employee_sql})
+                SELECT LEAST(FLOOR(hours / %s)::int, %s) AS bucket,
+                       COUNT(*) AS employee_count,
+                       SUM(hours) AS hours
+                  FROM per_employee
+              GROUP BY 1
+              ORDER BY 1
+            """, params + [bucket_size, max_buckets - 1])
+            buckets = []
+            for r in self.env.cr.dictfetchall():
+                start = r['bucket'] * bucket_size
+                buckets.append({
+                    'hours_from': start,
+                    'hours_to': start + bucket_size if r['bucket'] < max_buckets - 1 else False,
+                    'employee_count': r['employee_count'],
+                    'hours': round(r['hours'] or 0.0, 2),
+                })
+            result['buckets'] = buckets
+        return result
+
+    # Aggregates the top-N graph mode can answer; anything else goes through the regular read_group
+    _TOP_N_FIELDS = {'employee_id', 'working_hours', 'working_hours:sum', '__count'}
+    _TOP_N_ORDERS = {'working_hours': 'working_hours', '__count': '__count', 'employee_id_count': '__count'}
+
+    @api.model
+    def read_group(self, domain, fields, groupby, offset=0, limit=None, orderby=False, lazy=True):
+        # With `dashboard_graph_top_n` in context, grouping by employee alone returns
+        # the top N employees plus an "Others" group instead of one group per employee.
+        top_n = self.env.context.get('dashboard_graph_top_n')
+        groupby_list = [groupby] if isinstance(groupby, str) else list(groupby or [])
+        order_key, reverse = 'working_hours', True
+        if orderby:
+            order_terms = orderby.split(',')[0].split()
+            order_key = self._TOP_N_ORDERS.get(order_terms[0])
+            reverse = len(order_terms) > 1 and order_terms[1].lower() == 'desc'
+        if (not top_n or groupby_list != ['employee_id'] or offset or limit or not order_key
+                or any(f.replace(' ', '') not in self._TOP_N_FIELDS for f in fields or [])):
+            return super().read_group(domain, fields, groupby, offset=offset, limit=limit, orderby=orderby, lazy=lazy)
+
+        count_key = 'employee_id_count' if lazy else '__count'
+        data = self.get_employee_hours_graph_data(domain, top_n=top_n)
+        groups = []
+        for row in data['top']:
+            groups.append({
+                'employee_id': (row['employee_id'], row['name']),
+                count_key: row['record_count'],
+                'working_hours': row['hours'],
+                '__domain': (domain or []) + [('employee_id', '=', row['employee_id'])],
+            })
+        if orderby:
+            groups.sort(key=lambda g: g[count_key if order_key == '__count' else order_key], reverse=reverse)
+        others = data['others']
+        if others['employee_count']:
+            groups.append({
+                'employee_id': (0, 'Others (%s)' % others['employee_count']),
+                count_key: others['record_count'],
+                'working_hours': others['hours'],
+                '__domain': (domain or []) + [
+                    ('employee_id', '!=', False),
+                    ('employee_id', 'not in', others['employee_ids_excluded']),
+                ],
+            })
+        return groups
+
     @api.depends('submitted_on', 'report_type', 'report_date')
     def _compute_is_late(self):
         for rec in self:
@@ -390,11 +540,15 @@ class DashboardReport(models.Model):
 
 class MissedReport(models.Model):
     _name = 'dashboard.missed.report'
-    _description = 'Missed Reports per Employee'
+    _inherit = ['dashboard.replica.mixin']
+    _description = 'Missed Reports per Employee and Month'
     _rec_name = 'employee_id'
+    _order = 'report_month desc, employee_id'
 
-    employee_id = fields.Many2one('hr.employee', string='Employee', required=True)
+    employee_id = fields.Many2one('hr.employee', string='Employee', required=True, index=True)
     department_id = fields.Many2one('hr.department', string='Department')
+    report_month = fields.Char(string='Report Month', help='YYYY-MM', index=True)
+    is_closed = fields.Boolean('Closed Month', default=False, help='Snapshot of a finished month; never recomputed.')
     missed_pod = fields.Integer('Missed PODs', default=0)
     missed_sod = fields.Integer('Missed SODs', default=0)
     missed_dwr = fields.Integer('Missed DWRs', default=0)
@@ -411,129 +565,204 @@ class MissedReport(models.Model):
     has_tag_green = fields.Boolean('Has Missed with Green Tag', compute='_compute_missed_flags', store=True)
     has_tag_leave = fields.Boolean('Has Missed with Leave Tag', compute='_compute_missed_flags', store=True)
 
+    _sql_constraints = [
+        ('employee_month_uniq', 'unique(employee_id, report_month)',
+         'Only one missed report snapshot per employee and month is allowed.'),
+    ]
+
     @api.depends('missed_pod', 'missed_sod', 'missed_dwr')
     def _compute_total(self):
         for rec in self:
             rec.total_missed = (rec.missed_pod or 0) + (rec.missed_sod or 0) + (rec.missed_dwr or 0)
 
-    @api.model
-    def sync_missed_reports(self):
-        """Rebuild missed report records from dashboard.report data."""
-        # Removed full delete: existing = self.search([]); if existing: existing.unlink()
-
-        # Count only from first day of current month up to today (inclusive)
+    def _get_today(self):
         today_str = fields.Date.context_today(self)
         try:
-            today_dt = fields.Date.from_string(today_str)
+            return fields.Date.from_string(today_str)
         except Exception:
-            today_dt = None
+            return date.today()
 
-        if today_dt:
-            month_start = date(today_dt.year, today_dt.month, 1)
-            start_str = fields.Date.to_string(month_start)
-            end_str = fields.Date.to_string(today_dt)
-        else:
-            # fallback to no date restriction
-            start_str = False
-            end_str = False
+    def _count_by_employee(self, model, domain, employee_field):
+        """Return {employee_id: count} for `model` in a single grouped query."""
+        groups = self.env[model].read_group(domain, [employee_field], [employee_field])
+        counts = {}
+        for g in groups:
+            if g.get(employee_field):
+                counts[g[employee_field][0]] = g.get('__count', g.get(employee_field + '_count', 0))
+        return counts
+
+    @api.model
+    def _compute_month_snapshot(self, start, end, close=False):
+        """Write one snapshot row per active employee for the month starting at `start`.
+
+        Counts are taken from `start` to `end` (inclusive). Rows already closed
+        for that month are left untouched; `close=True` freezes the written rows.
+        """
+        month_str = f"{start.year:04d}-{start.month:02d}"
+        start_str = fields.Date.to_string(start)
+        end_str = fields.Date.to_string(end)
+
+        # compute working days in range (exclude Sundays)
+        working_days = 0
+        cur = start
+        while cur <= end:
+            if cur.weekday() != 6:
+                working_days += 1
+            cur = cur + timedelta(days=1)
+
+        task_domain = [('date', '>=', start_str), ('date', '<=', end_str)]
+        # POD submitted: daily.task with pod_submitted True
+        pod_counts = self._count_by_employee('daily.task', [('pod_submitted', '=', True)] + task_domain, 'employee_id')
+        # SOD submitted: daily.task with state == 'done' or sod_description present
+        sod_counts = self._count_by_employee('daily.task', [
+            '|', ('state', '=', 'done'), ('sod_description', '!=', False)
+        ] + task_domain, 'employee_id')
+        # DWR submitted: employee.report (dwr module) where submitted_time is set
+        dwr_counts = self._count_by_employee('employee.report', [('submitted_time', '!=', False)] + task_domain, 'name')
+
+        existing = {r.employee_id.id: r for r in self.search([('report_month', '=', month_str)])}
 
         employees = self.env['hr.employee'].search([('active', '=', True)])
+        if close:
+            # Employees archived after their row was written still get their row frozen
+            employees |= self.env['hr.employee'].with_context(active_test=False).browse(list(existing))
         for emp in employees:
-            # compute working days from month_start to today (exclude Sundays)
-            working_days = 0
-            if today_dt:
-                cur = month_start
-                while cur <= today_dt:
-                    if cur.weekday() != 6:
-                        working_days += 1
-                    cur = cur + timedelta(days=1)
-
-            # Date ranges for tasks and DWR
-            task_domain = []
-            dwr_domain = []
-            if start_str and end_str:
-                task_domain = [('date', '>=', start_str), ('date', '<=', end_str)]
-                dwr_domain = [('date', '>=', start_str), ('date', '<=', end_str)]
-
-            # POD submitted: count daily.task with pod_submitted True
-            pod_submitted = self.env['daily.task'].search_count([
-                ('employee_id', '=', emp.id), ('pod_submitted', '=', True)
-            ] + task_domain)
-
-            # SOD submitted: fetch tasks and count where state == 'done' or sod_description present
-            tasks = self.env['daily.task'].search([('employee_id', '=', emp.id)] + task_domain)
-            sod_submitted = sum(1 for t in tasks if (getattr(t, 'state', False) == 'done') or bool(getattr(t, 'sod_description', False)))
-
-            # DWR submitted: use employee.report (dwr module) where submitted_time is set
-            dwr_submitted = self.env['employee.report'].search_count([
-                ('name', '=', emp.id), ('submitted_time', '!=', False)
-            ] + dwr_domain)
-
-            # Compute missed as working_days - submitted (capped at 0)
-            missed_pod = working_days - pod_submitted if working_days and (working_days - pod_submitted) > 0 else 0
-            missed_sod = working_days - sod_submitted if working_days and (working_days - sod_submitted) > 0 else 0
-            missed_dwr = working_days - dwr_submitted if working_days and (working_days - dwr_submitted) > 0 else 0
-
-            # Create or update missed report for the employee
+            rec = existing.get(emp.id)
+            if rec and rec.is_closed:
+                continue
+
+            pod_submitted = pod_counts.get(emp.id, 0)
+            sod_submitted = sod_counts.get(emp.id, 0)
+            dwr_submitted = dwr_counts.get(emp.id, 0)
+
             vals = {
                 'employee_id': emp.id,
                 'department_id': emp.department_id.id if emp.department_id else False,
+                'report_month': month_str,
                 'total_working_days': working_days,
                 'pod_submitted_count': pod_submitted,
                 'sod_submitted_count': sod_submitted,
                 'dwr_submitted_count': dwr_submitted,
-                'missed_pod': missed_pod,
-                'missed_sod': missed_sod,
-                'missed_dwr': missed_dwr,
+                # missed = working_days - submitted (capped at 0)
+                'missed_pod': max(working_days - pod_submitted, 0),
+                'missed_sod': max(working_days - sod_submitted, 0),
+                'missed_dwr': max(working_days - dwr_submitted, 0),
+                'is_closed': close,
             }
-            existing = self.search([('employee_id', '=', emp.id)], limit=1)
-            if existing:
-                existing.write(vals)
+            if rec:
+                # Skip unchanged rows so stored flags are not recomputed for nothing
+                current = {k: rec[k] for k in vals}
+                current['employee_id'] = rec.employee_id.id
+                current['department_id'] = rec.department_id.id
+                if current != vals:
+                    rec.write(vals)
             else:
                 self.create(vals)
 
+        if close:
+            self.search([('report_month', '=', month_str), ('is_closed', '=', False)]).write({'is_closed': True})
+
         return True
 
-    @api.depends('missed_pod', 'missed_sod', 'missed_dwr')
+    @api.model
+    def close_missed_month(self, year, month):
+        """Freeze the snapshot of a finished month.
+
+        Does nothing for the current (open) month or a month that is already closed.
+        """
+        self = self.with_context(dashboard_use_replica=False)
+        start = date(int(year), int(month), 1)
+        today_dt = self._get_today()
+        if (start.year, start.month) >= (today_dt.year, today_dt.month):
+            return False
+        month_str = f"{start.year:04d}-{start.month:02d}"
+        closed = self.search_count([('report_month', '=', month_str), ('is_closed', '=', True)])
+        still_open = self.search_count([('report_month', '=', month_str), ('is_closed', '=', False)])
+        if closed and not still_open:
+            return False
+        from calendar import monthrange
+        last_day = monthrange(start.year, start.month)[1]
+        return self._compute_month_snapshot(start, date(start.year, start.month, last_day), close=True)
+
+    @api.model
+    def sync_missed_reports(self):
+        """Update the open month's missed report snapshot and freeze finished months.
+
+        Closed months are computed once and never touched again; only the
+        current month is recomputed on each run.
+        """
+        # Snapshots read what this transaction writes; never route them to a replica
+        self = self.with_context(dashboard_use_replica=False)
+        # Rows from before per-month snapshots carry no month; they are rebuilt below
+        legacy = self.search([('report_month', '=', False)])
+        if legacy:
+            legacy.unlink()
+
+        today_dt = self._get_today()
+        month_start = date(today_dt.year, today_dt.month, 1)
+        current_month = f"{month_start.year:04d}-{month_start.month:02d}"
+
+        # Freeze the previous month on the first run after it ends, plus any earlier
+        # month left open because the cron did not run across its boundary
+        prev = month_start - timedelta(days=1)
+        open_months = {f"{prev.year:04d}-{prev.month:02d}"}
+        open_months.update(self.search([
+            ('report_month', '<', current_month), ('is_closed', '=', False),
+        ]).mapped('report_month'))
+        for month_str in sorted(open_months):
+            year, month = month_str.split('-')
+            self.close_missed_month(year, month)
+
+        # Count only from first day of current month up to today (inclusive)
+        return self._compute_month_snapshot(month_start, today_dt)
+
+    @api.depends('missed_pod', 'missed_sod', 'missed_dwr', 'report_month')
     def _compute_missed_flags(self):
-        """Compute boolean flags by querying dashboard.report for this employee."""
+        """Compute boolean flags from missed dashboard.report rows, one grouped query per month."""
+        today_dt = self._get_today()
+        current_month = f"{today_dt.year:04d}-{today_dt.month:02d}"
+
+        # (report_month, employee_id) -> set of flags found among missed reports
+        found = {}
+        by_month = {}
         for rec in self:
-            emp_id = rec.employee_id.id if rec.employee_id else False
-            if not emp_id:
-                rec.has_missed_current_month = False
-                rec.has_missed_today = False
-                rec.has_missed_yesterday = False
-                rec.has_tag_red = False
-                rec.has_tag_blue = False
-                rec.has_tag_green = False
-                continue
-            # current month
-            rec.has_missed_current_month = self.env['dashboard.report'].search_count([
-                ('employee_id', '=', emp_id), ('is_missed', '=', True), ('is_current_month', '=', True)
-            ]) > 0
-            # today
-            rec.has_missed_today = self.env['dashboard.report'].search_count([
-                ('employee_id', '=', emp_id), ('is_missed', '=', True), ('is_today', '=', True)
-            ]) > 0
-            # yesterday
-            rec.has_missed_yesterday = self.env['dashboard.report'].search_count([
-                ('employee_id', '=', emp_id), ('is_missed', '=', True), ('is_yesterday', '=', True)
-            ]) > 0
+            if rec.employee_id:
+                by_month.setdefault(rec.report_month, set()).add(rec.employee_id.id)
+        for month, emp_ids in by_month.items():
+            domain = [('is_missed', '=', True), ('employee_id', 'in', list(emp_ids))]
+            if month:
+                domain.append(('report_month', '=', month))
+            # Stay on the primary: the rows were just written in this transaction
+            groups = self.env['dashboard.report'].with_context(dashboard_use_replica=False).read_group(
+                domain, ['employee_id'], ['employee_id', 'tag', 'is_today', 'is_yesterday'], lazy=False,
+            )
+            for g in groups:
+                flags = found.setdefault((month, g['employee_id'][0]), set())
+                flags.add('missed')
+                if g['tag']:
+                    flags.add(g['tag'])
+                if g['is_today']:
+                    flags.add('today')
+                if g['is_yesterday']:
+                    flags.add('yesterday')
+
+        for rec in self:
+            flags = found.get((rec.report_month, rec.employee_id.id), set()) if rec.employee_id else set()
+            # today / yesterday only apply to the open month
+            is_current = rec.report_month == current_month
+            rec.has_missed_current_month = is_current and 'missed' in flags
+            rec.has_missed_today = is_current and 'today' in flags
+            rec.has_missed_yesterday = is_current and 'yesterday' in flags
             # tag flags (any missed with that tag)
-            rec.has_tag_red = self.env['dashboard.report'].search_count([
-                ('employee_id', '=', emp_id), ('is_missed', '=', True), ('tag', '=', 'red')
-            ]) > 0
-            rec.has_tag_blue = self.env['dashboard.report'].search_count([
-                ('employee_id', '=', emp_id), ('is_missed', '=', True), ('tag', '=', 'blue')
-            ]) > 0
-            rec.has_tag_green = self.env['dashboard.report'].search_count([
-                ('employee_id', '=', emp_id), ('is_missed', '=', True), ('tag', '=', 'green')
-            ]) > 0
+            rec.has_tag_red = 'red' in flags
+            rec.has_tag_blue = 'blue' in flags
+            rec.has_tag_green = 'green' in flags
             rec.has_tag_leave = False
 
 
 class EmployeeMonthly(models.Model):
     _name = 'dashboard.employee.monthly'
+    _inherit = ['dashboard.replica.mixin']
     _description = 'Dashboard Employee Monthly Totals'
     _rec_name = 'employee_id'
 
@@ -611,6 +840,7 @@ class EmployeeMonthly(models.Model):
 
 class DepartmentMonthly(models.Model):
     _name = 'dashboard.department.monthly'
+    _inherit = ['dashboard.replica.mixin']
     _description = 'Dashboard Department Monthly Totals'
     _rec_name = 'department_id'
 
@@ -0,0 +1,3 @@
+from . import test_dashboard_replica
+from . import test_employee_hours_graph
+from . import test_missed_report
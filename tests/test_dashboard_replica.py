@@ -0,0 +1,121 @@
+from contextlib import closing
+from unittest.mock import patch
+
+from odoo import sql_db
+from odoo.tests.common import TransactionCase, tagged
+from odoo.tools import mute_logger
+
+from ..models import dashboard_replica
+from ..models.dashboard_replica import DashboardReplicaMixin, REPLICA_URI_PARAM, REPLICA_MAX_LAG_PARAM
+
+
+@tagged('post_install', '-at_install')
+class TestDashboardReplica(TransactionCase):
+    """Route dashboard reads to a second local database standing in for a replica."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.replica_db = '%s_dashboard_replica' % cls.env.cr.dbname
+
+        # Same dashboard_report columns as the primary, but holding a row only the replica has
+        cls.env.cr.execute("""
+            SELECT column_name, data_type FROM information_schema.columns
+             WHERE table_name = 'dashboard_report' ORDER BY ordinal_position
+        """)
+        columns = ', '.join('"%s" %s' % (name, data_type) for name, data_type in cls.env.cr.fetchall())
+
+        cls._drop_replica_db()
+        with closing(sql_db.db_connect('postgres').cursor()) as cr:
+            cr._cnx.autocommit = True
+            cr.execute('CREATE DATABASE "%s"' % cls.replica_db)
+        with closing(sql_db.db_connect(cls.replica_db).cursor()) as cr:
+            cr.execute('CREATE TABLE dashboard_report (%s)' % columns)
+            cr.execute("""
+                INSERT INTO dashboard_report (id, name, working_hours, report_type)
+                VALUES (999999, 'replica-only', 9.0, 'dwr')
+            """)
+            cr.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._drop_replica_db()
+        super().tearDownClass()
+
+    @classmethod
+    def _drop_replica_db(cls):
+        sql_db.close_db(cls.replica_db)
+        with closing(sql_db.db_connect('postgres').cursor()) as cr:
+            cr._cnx.autocommit = True
+            cr.execute('DROP DATABASE IF EXISTS "%s"' % cls.replica_db)
+
+    def setUp(self):
+        super().setUp()
+        dashboard_replica._replica_down_until.clear()
+        self.env['ir.config_parameter'].set_param(REPLICA_URI_PARAM, self.replica_db)
+        self.env['dashboard.report'].create({'name': 'primary-only', 'working_hours': 4.0, 'report_type': 'dwr'})
+        self.Report = self.env['dashboard.report'].with_context(dashboard_use_replica=True)
+
+    def _names(self, model):
+        rows = model.search_read([('name', 'in', ('replica-only', 'primary-only'))], ['name'])
+        return {row['name'] for row in rows}
+
+    def test_reads_land_on_replica(self):
+        self.assertEqual(self._names(self.Report), {'replica-only'})
+        groups = self.Report.read_group([('report_type', '=', 'dwr')], ['working_hours:sum'], [], lazy=False)
+        self.assertEqual(groups[0]['working_hours'], 9.0)
+
+    def test_routing_requires_context_key(self):
+        self.assertEqual(self._names(self.env['dashboard.report']), {'primary-only'})
+
+    def test_unreachable_replica_falls_back_to_primary(self):
+        uri = 'postgresql://127.0.0.1:1/%s' % self.replica_db
+        self.env['ir.config_parameter'].set_param(REPLICA_URI_PARAM, uri)
+        self.assertEqual(self._names(self.Report), {'primary-only'})
+        self.assertIn(uri, dashboard_replica._replica_down_until)
+
+    @mute_logger('odoo.sql_db', 'odoo.addons.custom_report_dashboard.models.dashboard_replica')
+    def test_query_error_on_replica_falls_back_to_primary(self):
+        # The postgres maintenance database has no dashboard_report table, like a stand-in behind on schema
+        self.env['ir.config_parameter'].set_param(REPLICA_URI_PARAM, 'postgres')
+        self.assertEqual(self._names(self.Report), {'primary-only'})
+        self.assertIn('postgres', dashboard_replica._replica_down_until)
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        self.env['ir.config_parameter'].set_param(REPLICA_MAX_LAG_PARAM, '30')
+        with patch.object(DashboardReplicaMixin, '_replica_lag', return_value=120.0):
+            self.assertEqual(self._names(self.Report), {'primary-only'})
+        with patch.object(DashboardReplicaMixin, '_replica_lag', return_value=5.0):
+            self.assertEqual(self._names(self.Report), {'replica-only'})
+
+    def test_list_view_rows_and_count_come_from_replica(self):
+        domain = [('name', 'in', ('replica-only', 'primary-only'))]
+        result = self.Report.web_search_read(domain, ['name'])
+        self.assertEqual(result['length'], 1)
+        self.assertEqual([r['name'] for r in result['records']], ['replica-only'])
+        self.assertEqual(self.Report.search_count(domain), 1)
+        self.assertEqual(self.env['dashboard.report'].search_count([('name', '=', 'replica-only')]), 0)
+
+    def test_replica_lag_of_standby(self):
+        class StubCursor:
+            def __init__(self, row):
+                self.row = row
+
+            def execute(self, query, params=None):
+                pass
+
+            def fetchone(self):
+                return self.row
+
+        Report = self.env['dashboard.report']
+        inf = float('inf')
+        cases = [
+            # (in_recovery, receiver running, receive == replay, replay age) -> lag
+            ((False, False, None, None), 0.0),
+            ((True, True, True, 500.0), 0.0),
+            ((True, True, False, 12.5), 12.5),
+            ((True, False, True, 1.0), inf),
+            ((True, True, False, None), inf),
+        ]
+        for row, expected in cases:
+            self.assertEqual(Report._replica_lag(StubCursor(row)), expected, row)
@@ -0,0 +1,78 @@
+from odoo.exceptions import UserError
+from odoo.tests.common import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestEmployeeHoursGraph(TransactionCase):
+    """Top-N employees plus an "Others" bucket for the working hours graph."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Report = cls.env['dashboard.report']
+        cls.employees = cls.env['hr.employee'].create([{'name': 'Graph Employee %s' % i} for i in range(5)])
+        # Per employee totals: 30 (two rows), 25, 12, 8, 3
+        hours = [(0, 20.0), (0, 10.0), (1, 25.0), (2, 12.0), (3, 8.0), (4, 3.0)]
+        cls.Report.create([{
+            'name': 'Graph Test',
+            'employee_id': cls.employees[i].id,
+            'working_hours': h,
+            'report_type': 'dwr',
+        } for i, h in hours])
+        cls.domain = [('name', '=', 'Graph Test')]
+
+    def _total_hours(self):
+        return self.Report.read_group(self.domain, ['working_hours:sum'], [], lazy=False)[0]['working_hours']
+
+    def test_top_n_and_others(self):
+        data = self.Report.get_employee_hours_graph_data(self.domain, top_n=2)
+        self.assertEqual([row['employee_id'] for row in data['top']], self.employees[:2].ids)
+        self.assertEqual([row['hours'] for row in data['top']], [30.0, 25.0])
+        self.assertEqual(data['top'][0]['record_count'], 2)
+        others = data['others']
+        self.assertEqual(others['employee_count'], 3)
+        self.assertEqual(others['record_count'], 3)
+        self.assertEqual(others['hours'], 23.0)
+        self.assertEqual(sum(row['hours'] for row in data['top']) + others['hours'], self._total_hours())
+
+    def test_read_group_top_n_mode(self):
+        Report = self.Report.with_context(dashboard_graph_top_n=2)
+        groups = Report.read_group(self.domain, ['working_hours:sum'], ['employee_id'], lazy=False)
+        self.assertEqual(len(groups), 3)
+        self.assertEqual(groups[-1]['employee_id'][0], 0)
+        self.assertEqual(sum(g['working_hours'] for g in groups), self._total_hours())
+        self.assertEqual(sum(g['__count'] for g in groups), 6)
+        # Drilling into "Others" finds exactly the employees outside the top N
+        others = self.Report.search(groups[-1]['__domain'])
+        self.assertEqual(others.employee_id, self.employees[2:])
+
+        lazy_groups = Report.read_group(self.domain, ['working_hours:sum'], ['employee_id'])
+        self.assertEqual([g['employee_id_count'] for g in lazy_groups], [2, 1, 3])
+
+        ordered = Report.read_group(self.domain, ['working_hours:sum'], ['employee_id'],
+                                    orderby='working_hours asc', lazy=False)
+        self.assertEqual([g['working_hours'] for g in ordered], [25.0, 30.0, 23.0])
+
+    def test_read_group_falls_back_when_unsupported(self):
+        Report = self.Report.with_context(dashboard_graph_top_n=2)
+        for kwargs in (
+            {'fields': ['manager_marks:sum']},
+            {'fields': ['working_hours:sum'], 'orderby': 'employee_id'},
+            {'fields': ['working_hours:sum'], 'limit': 10},
+            {'fields': ['working_hours:sum'], 'offset': 1},
+        ):
+            fields = kwargs.pop('fields')
+            groups = Report.read_group(self.domain, fields, ['employee_id'], lazy=False, **kwargs)
+            self.assertTrue(all(g['employee_id'][0] in self.employees.ids for g in groups), kwargs)
+            if not kwargs.get('offset'):
+                self.assertEqual(len(groups), 5, kwargs)
+
+    def test_histogram_capped_at_max_buckets(self):
+        data = self.Report.get_employee_hours_graph_data(self.domain, top_n=2, bucket_size=10, max_buckets=2)
+        buckets = data['buckets']
+        self.assertEqual(len(buckets), 2)
+        self.assertEqual((buckets[0]['hours_from'], buckets[0]['hours_to'], buckets[0]['employee_count']), (0.0, 10.0, 2))
+        self.assertEqual((buckets[1]['hours_from'], buckets[1]['hours_to'], buckets[1]['employee_count']), (10.0, False, 3))
+
+        with self.assertRaises(UserError):
+            self.Report.get_employee_hours_graph_data(self.domain, bucket_size=-5)
@@ -0,0 +1,113 @@
+from datetime import date
+from unittest.mock import patch
+
+from psycopg2 import IntegrityError
+
+from odoo.tests.common import TransactionCase, tagged
+from odoo.tools import mute_logger
+
+from ..models.dashboard_report import MissedReport
+
+
+@tagged('post_install', '-at_install')
+class TestMissedReportSnapshots(TransactionCase):
+    """Per-month missed report snapshots: open month updated, closed months frozen."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Missed = cls.env['dashboard.missed.report']
+        cls.emp = cls.env['hr.employee'].create({'name': 'Snapshot Employee'})
+        cls.emp_archived = cls.env['hr.employee'].create({'name': 'Snapshot Archived'})
+
+    def setUp(self):
+        super().setUp()
+        # Submitted counts per source, as returned by the grouped queries on daily.task / employee.report
+        self.submitted = {'pod': {}, 'sod': {}, 'dwr': {}}
+        self.today = date(2026, 3, 10)
+
+        test = self
+
+        def fake_counts(self, model, domain, employee_field):
+            if model == 'employee.report':
+                return dict(test.submitted['dwr'])
+            return dict(test.submitted['sod' if domain[0] == '|' else 'pod'])
+
+        patcher = patch.object(MissedReport, '_count_by_employee', new=fake_counts)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.object(MissedReport, '_get_today', new=lambda self: test.today)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _row(self, employee, month):
+        return self.Missed.search([('employee_id', '=', employee.id), ('report_month', '=', month)])
+
+    def test_closed_month_frozen_open_month_updated(self):
+        # 2026-03-01..10 has 8 working days (Sundays 1 and 8 excluded)
+        self.submitted['pod'] = {self.emp.id: 3}
+        self.Missed.sync_missed_reports()
+        march = self._row(self.emp, '2026-03')
+        self.assertEqual(len(march), 1)
+        self.assertEqual(march.total_working_days, 8)
+        self.assertEqual(march.missed_pod, 5)
+        self.assertFalse(march.is_closed)
+
+        # First run in April closes March over the full month (26 working days)
+        self.today = date(2026, 4, 2)
+        self.submitted['pod'] = {self.emp.id: 20}
+        self.Missed.sync_missed_reports()
+        self.assertTrue(march.is_closed)
+        self.assertEqual(march.total_working_days, 26)
+        self.assertEqual(march.missed_pod, 6)
+        april = self._row(self.emp, '2026-04')
+        self.assertFalse(april.is_closed)
+        self.assertEqual(april.missed_pod, 0)
+
+        # Later runs only touch the open month
+        self.submitted['pod'] = {}
+        self.Missed.sync_missed_reports()
+        self.assertEqual(march.missed_pod, 6)
+        self.assertEqual(march.pod_submitted_count, 20)
+        self.assertEqual(april.missed_pod, 2)
+
+    def test_archived_employee_row_is_frozen(self):
+        self.Missed.sync_missed_reports()
+        row = self._row(self.emp_archived, '2026-03')
+        self.assertTrue(row)
+        self.emp_archived.active = False
+
+        self.today = date(2026, 4, 1)
+        self.Missed.sync_missed_reports()
+        self.assertTrue(row.is_closed)
+        self.assertFalse(self.Missed.search_count([('report_month', '=', '2026-03'), ('is_closed', '=', False)]))
+
+    def test_months_left_open_by_a_gap_are_closed(self):
+        self.today = date(2026, 1, 15)
+        self.Missed.sync_missed_reports()
+        january = self._row(self.emp, '2026-01')
+        self.assertFalse(january.is_closed)
+
+        # The cron did not run in February or March
+        self.today = date(2026, 4, 1)
+        self.Missed.sync_missed_reports()
+        self.assertTrue(january.is_closed)
+        self.assertFalse(self.Missed.search_count([('report_month', '<', '2026-04'), ('is_closed', '=', False)]))
+
+    def test_legacy_rows_are_rebuilt(self):
+        legacy = self.Missed.create({'employee_id': self.emp.id, 'missed_pod': 42})
+        self.Missed.sync_missed_reports()
+        self.assertFalse(legacy.exists())
+        self.assertEqual(len(self._row(self.emp, '2026-03')), 1)
+
+    def test_unchanged_rows_are_not_rewritten(self):
+        self.Missed.sync_missed_reports()
+        with patch.object(MissedReport, 'write', autospec=True) as write:
+            self.Missed.sync_missed_reports()
+        self.assertFalse(write.called)
+
+    def test_one_row_per_employee_and_month(self):
+        self.Missed.sync_missed_reports()
+        with self.assertRaises(IntegrityError), mute_logger('odoo.sql_db'), self.cr.savepoint():
+            self.Missed.create({'employee_id': self.emp.id, 'report_month': '2026-03'})
+            self.Missed.flush_model()